@@ -0,0 +1,267 @@
+"""Helpers shared by the benchmark drivers.
+
+The helpers that depend on CLI arguments (`log`, `run_benchmark`,
+`save_checkpoint`, ...) require `init(args)` to be called with the parsed
+arguments first.
+"""
+
+import argparse
+import functools
+import json
+import shutil
+import subprocess
+import sys
+from os import (
+    PRIO_PROCESS,
+    cpu_count,
+    getcwd,
+    path,
+    replace,
+    sched_setaffinity,
+    setpriority,
+)
+from typing import Callable, Dict, List, Optional, Tuple
+
+# orjson is much faster than the standard json module on the number-heavy
+# data we produce, use it when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Both parsers accept bytes directly, so benchmark outputs don't need to be
+# decoded first
+loads = orjson.loads if orjson is not None else json.loads
+
+# Constants
+RIO = "Rio"
+BARE_METAL = "bare_metal"
+STARPU = "StarPU"
+
+join = path.join
+
+# Paths
+root = getcwd()
+benchmark_path = "/tmp"
+bench_path = join(root, "bench")
+rio_path = join(root, "rio")
+starpu_path = join(root, "starpu")
+bare_metal_path = join(root, "bare_metal")
+
+# The parsed CLI arguments of the driver, registered with `init`
+args: argparse.Namespace
+
+
+def init(cli_args: argparse.Namespace):
+    """Register the driver's parsed CLI arguments (verbose, timeout, file,
+    driver_core) used by the helpers below."""
+    global args
+    args = cli_args
+
+
+# —————————————————————————————————— Utils ——————————————————————————————————— #
+
+
+def log(text: str):
+    """Print a message, if verbose mode is activated"""
+    if args.verbose:
+        print(text)
+
+
+def isolate_driver():
+    """Pin the driver to a single core (outside of the benchmark pin sets)
+    and raise its priority, so that driver wakeups don't compete with the
+    benchmarked threads."""
+    driver_core = args.driver_core
+    if driver_core is None:
+        driver_core = (cpu_count() or 1) - 1
+    try:
+        sched_setaffinity(0, {driver_core})
+    except OSError:
+        log(f"Could not pin the driver to core {driver_core}")
+    try:
+        setpriority(PRIO_PROCESS, 0, -10)
+    except PermissionError:
+        # Raising the priority requires elevated privileges, but the driver
+        # works fine without
+        log("Could not raise the driver priority")
+
+
+def dump_results(experiments: Dict) -> str:
+    """Serialize the experiment results to an indented json string."""
+    if orjson is not None:
+        return orjson.dumps(experiments, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(experiments, indent=2)
+
+
+def save_checkpoint(experiments: Dict):
+    """Atomically persist the results collected so far, so that a crashed or
+    killed run can be resumed without re-measuring completed work."""
+    if args.file is None:
+        return
+    checkpoint = args.file
+    tmp_file = checkpoint + ".tmp"
+    with open(tmp_file, "w") as file:
+        file.write(dump_results(experiments))
+    replace(tmp_file, checkpoint)
+
+
+def check_hwloc_bind():
+    """Check that `hwloc-bind` is available, with a PATH lookup instead of
+    forking a child process just to probe for it."""
+    if shutil.which("hwloc-bind") is None:
+        sys.exit("Could not find `hwloc-bind`, is hwloc installed?")
+
+
+def run(cmd_args: List[str], cwd: Optional[str] = None, timeout: Optional[int] = None):
+    """A small wrapper around subprocess.run, will check for errors"""
+    result = subprocess.run(cmd_args, stdout=subprocess.DEVNULL, cwd=cwd, timeout=timeout)
+    result.check_returncode()
+
+
+def run_benchmark(
+    cmd_args: List[str],
+    env: Dict[str, str],
+    extra_processing: Optional[Callable[[str], Dict[str, float]]] = None,
+    parse: bool = True,
+) -> Optional[Dict[str, float]]:
+    """A wrapper around subprocess.run for benchmark use.
+    The output of the subprocess will be captured, parsed as json and returned.
+    In case of timeout, None is returned instead.
+
+    An `extra_processing` callable receives the stderr of the benchmarked
+    process and returns fields to merge into the json results. Warm-up and
+    probe runs can pass `parse=False` to discard the output instead of
+    parsing results that are thrown away anyway; they get an empty dict back
+    on success, so that a timeout is still distinguishable."""
+    # Python file descriptors are non-inheritable (PEP 446), so the closing
+    # loop can be skipped, keeping the fast posix_spawn path
+    handle = subprocess.Popen(
+        cmd_args,
+        stdout=subprocess.PIPE if parse else subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        env=env,
+        close_fds=False,
+        cwd=benchmark_path,
+    )
+    try:
+        stdout, stderr = handle.communicate(timeout=args.timeout)
+    except subprocess.TimeoutExpired:
+        # kill the process
+        handle.kill()
+        handle.wait()
+        return None
+    if not handle.returncode == 0:
+        # Something bad happened
+        raise Exception(f"Process exited with non zero code: {cmd_args}")
+    if not parse:
+        return {}
+    # Return the benchmark results
+    results = loads(stdout)
+    if extra_processing is not None:
+        results.update(extra_processing(stderr.decode()))
+    return results
+
+
+@functools.lru_cache(maxsize=1024)
+def prepare_flags(
+    flags: Tuple[str, ...],
+    nb_threads: int,
+    problem_size: int,
+    task_size: int,
+    core_offset: int = 0,
+) -> Tuple[str, ...]:
+    """Substiture all placeholders in the given flags.
+
+    The same flags are re-substituted identically across the warm-up and all
+    `n_runs` repetitions, hence the memoization. A tuple is returned so that
+    the cached value stays immutable."""
+    return tuple(
+        flag.replace("%n", str(nb_threads))
+        .replace("%t", str(task_size))
+        .replace("%p", str(problem_size))
+        .replace("%c", str(core_offset))
+        for flag in flags
+    )
+
+
+# ——————————————————————————————— Build Utils ———————————————————————————————— #
+
+
+# Artefacts already built during this invocation, keyed by (runtime, target)
+built_artefacts: Dict[Tuple[str, str], str] = {}
+
+
+def register_artefact(runtime: str, target: str, exe: str):
+    """Record a built artefact, checking that the same (runtime, target) key
+    always resolves to the same path."""
+    assert built_artefacts.get((runtime, target), exe) == exe
+    built_artefacts[(runtime, target)] = exe
+
+
+def copy_artefact(src: str, exe: str):
+    """Copy a built artefact to the benchmark directory, unless the existing
+    copy is already up to date (copy2 preserves mtimes, so an exe at least as
+    recent as the source is the same build)."""
+    try:
+        if path.getmtime(exe) >= path.getmtime(src):
+            return
+    except OSError:
+        # No previous copy
+        pass
+    shutil.copy2(src, exe)
+
+
+def build_rio_targets(build_targets: List[str]) -> Dict[str, str]:
+    """Build all Rio targets in a single cargo invocation and return a map
+    from target name to produced artefact"""
+    new_targets = [t for t in build_targets if (RIO, t) not in built_artefacts]
+    if new_targets:
+        log(f"Building {', '.join(new_targets)} for Rio")
+        cmd = ["cargo", "build", "--release"]
+        for target in new_targets:
+            cmd += ["--bin", target]
+        run(cmd, cwd=rio_path)
+        rio_target_path = join(rio_path, "target", "release")
+        for target in new_targets:
+            exe = join(benchmark_path, "rio_" + target)
+            copy_artefact(join(rio_target_path, target), exe)
+            register_artefact(RIO, target, exe)
+    return {target: built_artefacts[(RIO, target)] for target in build_targets}
+
+
+def build_starpu_targets(build_targets: List[str]) -> Dict[str, str]:
+    """Build all StarPU targets in a single make invocation and return a map
+    from target name to produced artifact"""
+    new_targets = [t for t in build_targets if (STARPU, t) not in built_artefacts]
+    if new_targets:
+        log(f"Building {', '.join(new_targets)} for StarPU")
+        # No -B: make's dependency tracking skips up-to-date targets
+        run(["make"] + new_targets, cwd=starpu_path)
+        for target in new_targets:
+            exe = join(benchmark_path, "starpu_" + target)
+            copy_artefact(join(starpu_path, target), exe)
+            register_artefact(STARPU, target, exe)
+    return {target: built_artefacts[(STARPU, target)] for target in build_targets}
+
+
+def build_bare_metal_targets(build_targets: List[str]) -> Dict[str, str]:
+    """Build all Bare Metal targets in a single make invocation and return a
+    map from target name to produced artefact"""
+    new_targets = [t for t in build_targets if (BARE_METAL, t) not in built_artefacts]
+    if new_targets:
+        log(f"Building {', '.join(new_targets)} for bare metal")
+        # No -B: make's dependency tracking skips up-to-date targets
+        run(["make"] + new_targets, cwd=bare_metal_path)
+        for target in new_targets:
+            exe = join(benchmark_path, "bare_metal_" + target)
+            copy_artefact(join(bare_metal_path, target), exe)
+            register_artefact(BARE_METAL, target, exe)
+    return {target: built_artefacts[(BARE_METAL, target)] for target in build_targets}
+
+
+runtime_builders: Dict[str, Callable[[List[str]], Dict[str, str]]] = {
+    RIO: build_rio_targets,
+    STARPU: build_starpu_targets,
+    BARE_METAL: build_bare_metal_targets,
+}
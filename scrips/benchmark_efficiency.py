@@ -1,27 +1,31 @@
-import subprocess
-import json
 import argparse
+import statistics
 import time
 import sys
-import math
-from os import path, getcwd, chdir, environ
-from typing import List, Optional, Dict, Union, Tuple, Iterator, Callable
-
-# Constants
-RIO = "Rio"
-BARE_METAL = "bare_metal"
-STARPU = "StarPU"
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from os import cpu_count, environ
+from queue import Queue
+from typing import List, Optional, Dict, Tuple, Callable
+
+import _bench_common as common
+from _bench_common import (
+    BARE_METAL,
+    RIO,
+    STARPU,
+    bench_path,
+    check_hwloc_bind,
+    dump_results,
+    isolate_driver,
+    loads,
+    log,
+    prepare_flags,
+    run,
+    run_benchmark,
+    runtime_builders,
+    save_checkpoint,
+)
 
 t = time.time()
-join = path.join
-
-# Paths
-root = getcwd()
-benchmark_path = "/tmp"
-bench_path = join(root, "bench")
-rio_path = join(root, "rio")
-starpu_path = join(root, "starpu")
-bare_metal_path = join(root, "bare_metal")
 
 experiment_targets = {
     "counter": {
@@ -60,34 +64,56 @@ runtime_environments = {
     },
 }
 
-# Extra bash commands that can be passed to further refine benchmark output.
-# The output will be piped (unix '|') into them.
-runtime_extra_processing = {
+def parse_starpu_stats(stderr: str) -> Dict[str, float]:
+    """Parse the worker stats that StarPU prints on stderr.
+
+    Sums the task count over all workers, as well as the total working,
+    sleeping and overhead times (converted from ms to seconds)."""
+    tasks = 0
+    working = 0.0
+    sleeping = 0.0
+    overhead = 0.0
+    for line in stderr.splitlines():
+        fields = line.split()
+        if "task" in line and fields and fields[0].isdigit():
+            tasks += int(fields[0])
+        elif "total:" in line and len(fields) >= 11:
+            working += float(fields[4])
+            sleeping += float(fields[7])
+            overhead += float(fields[10])
+    return {
+        "tasks": tasks,
+        "working": working / 1000,
+        "sleeping": sleeping / 1000,
+        "overhead": overhead / 1000,
+    }
+
+
+# Extra python functions that can be passed to further refine benchmark
+# output. They receive the stderr of the benchmarked process and return
+# fields to merge into the json results.
+runtime_extra_processing: Dict[str, Optional[Callable[[str], Dict[str, float]]]] = {
     RIO: None,
     BARE_METAL: None,
-    # StarPU output stats to stderr, we pipe that into awk to extend the json with useful data
-    STARPU: [
-        "awk",
-        "-v",
-        "CONVFMT=%.12g",
-        r"""/task/{tasks+=$1}; /total:/{working+=$5; sleeping+=$8; overhead+=$11}; /{.*}/{json=substr($0, 2, length($0)-2)}; END{print "{" json ",\"tasks\":" tasks ",\"working\":" working / 1000 ",\"sleeping\":" sleeping / 1000 ",\"overhead\":" overhead / 1000 "}"}""",
-    ],
+    # StarPU outputs worker stats on stderr
+    STARPU: parse_starpu_stats,
 }
 
 # —————————————————————————————————— Flags ——————————————————————————————————— #
 
-hwloc_bind_flags = ["core:0:%n"]
+# Flags are stored as tuples so that `prepare_flags` results can be memoized
+hwloc_bind_flags = ("core:%c:%n",)
 bench_flags = {
-    RIO: ["-j", "--args", "%p %t -n %n"],
-    BARE_METAL: ["-j", "--args", "%p %t"],
-    STARPU: ["-j", "--args", "%p %t"],
+    RIO: ("-j", "--args", "%p %t -n %n"),
+    BARE_METAL: ("-j", "--args", "%p %t"),
+    STARPU: ("-j", "--args", "%p %t"),
 }
 bench_flag_overwrite = {
     "lu_counter_2d": {
-        RIO: ["-j", "--args", "%p %t -n %n --2d"],
+        RIO: ("-j", "--args", "%p %t -n %n --2d"),
     },
     "lu_counter_1d": {
-        RIO: ["-j", "--args", "%p %t -n %n --1d"],
+        RIO: ("-j", "--args", "%p %t -n %n --1d"),
     },
 }
 
@@ -133,160 +159,88 @@ parser.add_argument(
 parser.add_argument(
     "--average-on",
     metavar="N",
-    help="average the results on N runs (default to 1)",
+    help="collect N runs per point and keep their median (default to 1)",
     type=int,
     default=1,
     dest="average_on",
 )
+parser.add_argument(
+    "--warmup",
+    metavar="K",
+    help="number of untimed warm-up runs before a measured point (default to 1)",
+    type=int,
+    default=1,
+    dest="warmup",
+)
+parser.add_argument(
+    "--driver-core",
+    metavar="C",
+    help="core on which the driver is pinned (default to the last core)",
+    type=int,
+    dest="driver_core",
+)
+parser.add_argument(
+    "--warmup-per-point",
+    help="run an extra untimed warm-up before each parameter point",
+    action="store_true",
+    dest="warmup_per_point",
+)
+parser.add_argument(
+    "-j",
+    "--jobs",
+    metavar="J",
+    help="number of (experiment, runtime) pairs benchmarked concurrently on"
+    " disjoint core sets (default to (nb_cores - 1) // nb_threads)",
+    type=int,
+    dest="jobs",
+)
 
 args = parser.parse_args()
+common.init(args)
 
 
 # —————————————————————————————————— Utils ——————————————————————————————————— #
 
 
-def log(text: str):
-    """Print a message, if verbose mode is activated"""
-    if args.verbose:
-        print(text)
-
-
-def run(cmd_args: List[str]):
-    """A small wrapper around subprocess.run"""
-    result = subprocess.run(cmd_args, stdout=subprocess.DEVNULL)
-    result.check_returncode()
-
-
-def run_benchmark(
-    cmd_args: List[str],
-    env: Dict[str, str],
-    extra_processing: Union[None, List[str]] = None,
-) -> Optional[Dict[str, float]]:
-    """A wrapper around subprocess.run for benchmark use.
-    The output of the subprocess will be captured, parsed as json and returned.
-    In case of timeout, None is returned instead.
-    """
-    handle = subprocess.Popen(
-        cmd_args,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        env=env,
-    )
-    t = time.time()
-    while True:
-        ret = handle.poll()
-        if ret is None:
-            if time.time() - t > args.timeout:
-                # kill the process
-                handle.terminate()
-                handle.wait()
-                return None
-            else:
-                # Wait some more time
-                time.sleep(1)
-        else:
-            if not ret == 0 or handle.stdout is None:
-                # Something bad happened
-                raise Exception(f"Process exited with non zero code: {cmd_args}")
-            else:
-                if extra_processing is not None:
-                    handle = subprocess.Popen(
-                        extra_processing,
-                        stdin=handle.stdout,
-                        stdout=subprocess.PIPE,
-                    )
-                    handle.wait()
-                # Return the benchmark results
-                output = handle.stdout.read()
-                return json.loads(output)
-
-
-def prepare_flags(
-    flags: List[str], nb_threads: int, problem_size: int, task_size: int
-) -> List[str]:
-    """Substiture all placeholders in the given flags."""
-    return [
-        flag.replace("%n", str(nb_threads))
-        .replace("%t", str(task_size))
-        .replace("%p", str(problem_size))
-        for flag in flags
-    ]
-
-
-def update_run_stats(previous: Dict[str, float], new_run: Dict[str, Union[float, int]]):
-    for field, value in new_run.items():
-        if not field in previous:
-            previous[field] = 0
-        previous[field] += value
+def aggregate_run_stats(samples: Dict[str, List[float]]) -> Dict[str, float]:
+    """Reduce the per-run samples to their median, one pass per field.
+
+    The median is robust against the cold-cache and scheduling outliers that
+    skew a mean, so fewer repetitions are needed for stable results."""
+    return {field: statistics.median(values) for (field, values) in samples.items()}
 
 
 def append_run_stats(
     stats: Dict[str, List[float]],
     run_stats: Dict[str, float],
-    average_on: int,
     task_size: int,
 ):
     for field, value in run_stats.items():
-        if not field in stats:
-            stats[field] = []
-        stats[field].append(value / average_on)
-    if not "task_size" in stats:
-        stats["task_size"] = []
-    stats["task_size"].append(task_size)
-
-
-# ——————————————————————————————— Build Utils ———————————————————————————————— #
-
-
-def build_rio_target(target: str) -> str:
-    """Build a Rio target and return the name of the produced artefact"""
-    log(f"Building {target} for Rio")
-    chdir(rio_path)
-    run(["cargo", "build", "--bin", target, "--release"])
-    exe = join(benchmark_path, "rio_" + target)
-    rio_target_path = join("target", "release")
-    run(["cp", join(rio_target_path, target), exe])
-    return exe
-
-
-def build_starpu_target(target: str) -> str:
-    """Build a StarPU target and return the name of the produced artifact"""
-    log(f"Building {target} for StarPU")
-    chdir(starpu_path)
-    run(["make", "-B", target])
-    exe = join(benchmark_path, "starpu_" + target)
-    run(["cp", target, exe])
-    return exe
-
-
-def build_bare_metal_target(target: str) -> str:
-    """Build a Bare Metal target and return the name of the produced artefact"""
-    log(f"Building {target} for bare metal")
-    chdir(bare_metal_path)
-    run(["make", "-B", target])
-    exe = join(benchmark_path, "bare_metal_" + target)
-    run(["cp", target, exe])
-    return exe
+        stats.setdefault(field, []).append(value)
+    stats.setdefault("task_size", []).append(task_size)
 
 
 # ————————————————————— Experiment parameters iterators —————————————————————— #
 
 
-def counterParameters(runtime: str, nb_threads: int) -> Iterator[Tuple[int, int]]:
+def counterParameters(runtime: str, nb_threads: int) -> Tuple[Tuple[int, int, int], ...]:
     """Calibrate the number of tasks so that one run takes between ~1s and ~10s
     on the counter family of experiments"""
+    parameters = []
     for g in range(24, 4, -1):
         t_size = 2 ** g
         n_tasks = 2 ** (33 - g)
         if runtime != BARE_METAL:
             n_tasks = n_tasks * nb_threads
-        yield (t_size, n_tasks)
+        parameters.append((g, t_size, n_tasks))
+    return tuple(parameters)
 
 
 def matrixCounterParameters(
-    _runtime: str, _nb_threads: int
-) -> Iterator[Tuple[int, int]]:
-    """An iterator for the LU & MM counter benchmarks"""
+    runtime: str, nb_threads: int
+) -> Tuple[Tuple[int, int, int], ...]:
+    """A parameter table for the LU & MM counter benchmarks"""
+    parameters = []
     for g in range(24, 4, -1):
         t_size = 2 ** g
         n_tasks = 2 ** (24 - g)
@@ -296,19 +250,18 @@ def matrixCounterParameters(
                 n_tasks = n_tasks // nb_threads
             else:
                 t_size = t_size // nb_threads
-        yield (t_size, n_tasks)
+        parameters.append((g, t_size, n_tasks))
+    return tuple(parameters)
 
 
-def matrixParameters(_runtime: str, _nb_threads: int) -> Iterator[Tuple[int, int]]:
-    """An iterator returning appropriate task sizes for matrix operations
+def matrixParameters(_runtime: str, _nb_threads: int) -> Tuple[Tuple[int, int, int], ...]:
+    """A parameter table with appropriate task sizes for matrix operations
     (gemm, LU...) with real data"""
     n_tasks = 2 ** 12
-    for g in range(11, 2, -1):
-        t_size = 2 ** g
-        yield (t_size, n_tasks)
+    return tuple((g, 2 ** g, n_tasks) for g in range(11, 2, -1))
 
 
-experiment_parameters: Dict[str, Callable[[str, int], Iterator[Tuple[int, int]]]] = {
+experiment_parameters: Dict[str, Callable[[str, int], Tuple[Tuple[int, int, int], ...]]] = {
     "counter": counterParameters,
     "counter_deps": counterParameters,
     "mm_mkl": matrixParameters,
@@ -324,8 +277,22 @@ if not args.average_on >= 1:
     print(f"Invalid number of runs: got '{args.average_on}'")
     sys.exit(1)
 
+if not args.warmup >= 0:
+    print(f"Invalid number of warm-up runs: got '{args.warmup}'")
+    sys.exit(1)
+
+if args.jobs is None:
+    # Run as many benchmarks as fit on disjoint core sets, keeping one core
+    # free for the driver (see isolate_driver)
+    nb_cores = cpu_count() or args.nb_threads + 1
+    args.jobs = max(1, (nb_cores - 1) // args.nb_threads)
+if not args.jobs >= 1:
+    print(f"Invalid number of jobs: got '{args.jobs}'")
+    sys.exit(1)
+
 print("Experiment setting:\n")
 print(f"  - number of threads:\t{args.nb_threads}")
+print(f"  - concurrent jobs:\t{args.jobs}")
 print(f"  - averaged on:\t{args.average_on} run{'s' if args.average_on > 1 else ''}")
 print(f"  - timeout:\t\t{args.timeout}s")
 print(f"  - experiments: \t{args.experiment if args.experiment is not None else 'all'}")
@@ -334,10 +301,9 @@ print()
 # ——————————————————————————————— Build Phase ———————————————————————————————— #
 
 log("Checking `hwloc-bind` availability...")
-run(["hwloc-bind", "--version"])
+check_hwloc_bind()
 log("Building bench...")
-chdir(bench_path)
-run(["cargo", "install", "--path", "."])
+run(["cargo", "install", "--path", "."], cwd=bench_path)
 
 
 log("Loading data file if it exists...")
@@ -345,8 +311,8 @@ experiments = {}
 todo_experiments = []
 try:
     if args.file is not None:
-        with open(join("../", args.file), "r") as file:
-            experiments = json.load(file)
+        with open(args.file, "rb") as file:
+            experiments = loads(file.read())
             log("File found")
 except OSError:
     # The file does not yet exists, this is fine
@@ -355,103 +321,163 @@ except OSError:
 
 
 log("\nBuilding targets...")
-targets: Dict[str, Dict[str, str]] = {}
-for (experiment, exp_targets) in experiment_targets.items():
-    targets[experiment] = {}
+# Collect the unique targets of each runtime so that a single cargo/make
+# invocation builds all of them at once
+runtime_targets: Dict[str, List[str]] = {}
+for exp_targets in experiment_targets.values():
     for (runtime, target) in exp_targets.items():
-        if runtime == RIO:
-            targets[experiment][RIO] = build_rio_target(target)
-        elif runtime == STARPU:
-            targets[experiment][STARPU] = build_starpu_target(target)
-        elif runtime == BARE_METAL:
-            targets[experiment][BARE_METAL] = build_bare_metal_target(target)
-        else:
+        if runtime not in runtime_builders:
             raise Exception(f"Unkonw runtime: {runtime}")
+        if target not in runtime_targets.setdefault(runtime, []):
+            runtime_targets[runtime].append(target)
+
+built = {
+    runtime: runtime_builders[runtime](build_targets)
+    for (runtime, build_targets) in runtime_targets.items()
+}
+
+targets: Dict[str, Dict[str, str]] = {}
+for (experiment, exp_targets) in experiment_targets.items():
+    targets[experiment] = {
+        runtime: built[runtime][target] for (runtime, target) in exp_targets.items()
+    }
 
 # ———————————————————————————————— Benchmark ————————————————————————————————— #
 
-chdir(benchmark_path)
+# Pin the driver only once the builds are done, so that cargo and make still
+# get the whole machine
+isolate_driver()
+
 n_runs = args.average_on
 nb_threads = args.nb_threads
 
+
+def benchmark_runtime(
+    experiment: str, runtime: str, target: str, core_offset: int
+) -> Dict[str, List[float]]:
+    """Run the full parameter sweep for a single (experiment, runtime) pair,
+    pinned to `nb_threads` cores starting at `core_offset`, and return the
+    collected stats."""
+    time.sleep(1)  # Sleep to let the OS clean old processes and reduce noise
+    log(f"[{experiment}/{runtime}] Benchmarking")
+    parameters = experiment_parameters[experiment]
+
+    # The environment and post-processing step only depend on the runtime,
+    # build them once instead of on every run
+    merged_env = {**environ, **runtime_environments[runtime]}
+    extra_processing = runtime_extra_processing[runtime]
+
+    # The pin set and bench flag set are constant over the sweep, only the
+    # per-point suffix changes with the parameters
+    cmd_prefix = (
+        ["hwloc-bind"]
+        + list(prepare_flags(hwloc_bind_flags, nb_threads, 0, 0, core_offset))
+        + ["bench", f"{target}"]
+    )
+    exp_bench_flags = bench_flags[runtime]
+    if experiment in bench_flag_overwrite:
+        exp_bench_flags = bench_flag_overwrite[experiment][runtime]
+
+    # Stats to be collected
+    data = {}
+    scaling = 1  # Scaling factor
+    warm_up = True
+    for (g, t_size, n_tasks) in parameters(runtime, nb_threads):
+        log(f"[{experiment}/{runtime}] Running with g={g}...")
+
+        # Scale down the number of tasks to keep reasonable execution times
+        if int(n_tasks / scaling) >= 1:
+            n_tasks = int(n_tasks / scaling)
+
+        experiment_args = cmd_prefix + list(
+            prepare_flags(exp_bench_flags, nb_threads, n_tasks, t_size, core_offset)
+        )
+
+        # Warming up for the first run with each runtime, and before every
+        # parameter point if requested (reduces variance from cold caches,
+        # which matters for the scaling decision below)
+        if warm_up or args.warmup_per_point:
+            warm_up = False
+            for _ in range(args.warmup):
+                run_benchmark(experiment_args, merged_env, parse=False)
+
+        # Run benchmark, collecting one sample per field per run
+        timeout = False
+        samples: Dict[str, List[float]] = {}
+        for _ in range(n_runs):
+            results = run_benchmark(experiment_args, merged_env, extra_processing)
+            if results is None:
+                log(f"[{experiment}/{runtime}] Timeout")
+                timeout = True
+                break
+            for (field, value) in results.items():
+                samples.setdefault(field, []).append(value)
+
+        if timeout:
+            break
+        run_stat = aggregate_run_stats(samples)
+        run_stat["scaling_factor"] = scaling
+        append_run_stats(data, run_stat, t_size)
+
+        # Scale down the number of tasks if the execution took too long,
+        # based on the cumulated execution time of the n_runs repetitions
+        if "execution_time" in samples:
+            exec_time = sum(samples["execution_time"])
+            if exec_time >= 40:
+                scaling *= 2
+            if exec_time >= 80:
+                scaling *= 2
+            if exec_time >= 160:
+                scaling *= 2
+
+    return data
+
+
+# Enumerate the work items, one per (experiment, runtime) pair
+benchmark_jobs = []
 for (experiment, exp_targets) in targets.items():
     if not (args.experiment == None or args.experiment == experiment):
         continue
     else:
         if not experiment in experiments:
             experiments[experiment] = {}
-    parameters = experiment_parameters[experiment]
     for (runtime, target) in exp_targets.items():
-        time.sleep(1)  # Sleep to let the OS clean old processes and reduce noise
-        log(f"Benchmarking {runtime}")
-
-        # Stats to be collected
-        data = {}
-        scaling = 1  # Scaling factor
-        warm_up = True
-        for (t_size, n_tasks) in parameters(runtime, nb_threads):
-            log(f"Running with g={int(math.log(t_size, 2))}...")
-
-            # Scale down the number of tasks to keep reasonable execution times
-            if int(n_tasks / scaling) >= 1:
-                n_tasks = int(n_tasks / scaling)
-
-            exp_bench_flags = bench_flags[runtime]
-            if experiment in bench_flag_overwrite:
-                exp_bench_flags = bench_flag_overwrite[experiment][runtime]
-            experiment_args = (
-                ["hwloc-bind"]
-                + prepare_flags(hwloc_bind_flags, nb_threads, n_tasks, t_size)
-                + ["bench", f"{target}"]
-                + prepare_flags(exp_bench_flags, nb_threads, n_tasks, t_size)
-            )
-
-            # Warming up for the first run with each runtime
-            if warm_up:
-                warm_up = False
-                run_benchmark(
-                    experiment_args,
-                    dict(**environ, **runtime_environments[runtime]),
-                    runtime_extra_processing[runtime],
-                )
-
-            # Run benchmark
-            timeout = False
-            run_stat = {}
-            for _ in range(n_runs):
-                results = run_benchmark(
-                    experiment_args,
-                    dict(**environ, **runtime_environments[runtime]),
-                    runtime_extra_processing[runtime],
-                )
-                if results is None:
-                    log("Timeout")
-                    timeout = True
-                    break
-                update_run_stats(run_stat, results)
-
-            if timeout:
-                break
-            run_stat["scaling_factor"] = scaling * n_runs  # will be averaged on n_runs
-            append_run_stats(data, run_stat, n_runs, t_size)
-
-            # Scale down the number of tasks if the execution took too long
-            if "execution_time" in run_stat:
-                exec_time = run_stat["execution_time"]
-                if exec_time >= 40:
-                    scaling *= 2
-                if exec_time >= 80:
-                    scaling *= 2
-                if exec_time >= 160:
-                    scaling *= 2
-
+        if runtime in experiments[experiment]:
+            # Already measured by a previous (interrupted) run
+            log(f"[{experiment}/{runtime}] Found in data file, skipping")
+            continue
+        benchmark_jobs.append((experiment, runtime, target))
+
+# Each job picks a free core offset so that pinned core sets never overlap
+free_core_offsets: "Queue[int]" = Queue()
+for job_idx in range(args.jobs):
+    free_core_offsets.put(job_idx * nb_threads)
+
+
+def dispatch_benchmark(
+    experiment: str, runtime: str, target: str
+) -> Tuple[str, str, Dict[str, List[float]]]:
+    """Reserve a core set, run the sweep for the given pair, then release the
+    core set for the next job."""
+    core_offset = free_core_offsets.get()
+    try:
+        data = benchmark_runtime(experiment, runtime, target, core_offset)
+    finally:
+        free_core_offsets.put(core_offset)
+    return (experiment, runtime, data)
+
+
+with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+    futures = [pool.submit(dispatch_benchmark, *job) for job in benchmark_jobs]
+    for future in as_completed(futures):
+        (experiment, runtime, data) = future.result()
         experiments[experiment][runtime] = data
+        # Persist partial results so an aborted run does not lose them
+        save_checkpoint(experiments)
 
 log(f"Done in {time.time() - t:.2f}s")
 
 if args.file is not None:
-    chdir(root)
-    with open(args.file, "w") as file:
-        json.dump(experiments, file, indent=2)
+    save_checkpoint(experiments)
 else:
-    print(json.dumps(experiments, indent=2))
+    print(dump_results(experiments))
@@ -1,26 +1,39 @@
-import subprocess
-import json
 import argparse
+import statistics
 import time
 import sys
-from os import path, getcwd, chdir, environ
-from typing import List, Optional, Dict
+from os import environ, path
+from typing import List, Dict
+
+import _bench_common as common
+from _bench_common import (
+    bench_path,
+    benchmark_path,
+    check_hwloc_bind,
+    copy_artefact,
+    dump_results,
+    isolate_driver,
+    loads,
+    log,
+    prepare_flags,
+    rio_path,
+    run,
+    run_benchmark,
+    save_checkpoint,
+)
 
 t = time.time()
 
 # Paths
-root = getcwd()
 program = "counter"
-benchmark_path = "/tmp"
-bench_path = path.join(root, "bench")
 exec_path = path.join(benchmark_path, program)
-rio_path = path.join(root, "rio")
-program_path = path.join(root, "rio", "target", "release", program)
+program_path = path.join(rio_path, "target", "release", program)
 
 # —————————————————————————————————— Flags ——————————————————————————————————— #
 
-hwloc_bind_flags = ["core:0:%n"]
-bench_flags = ["-j", "--args", "%p %t -n %n"]
+# Flags are stored as tuples so that `prepare_flags` results can be memoized
+hwloc_bind_flags = ("core:0:%n",)
+bench_flags = ("-j", "--args", "%p %t -n %n")
 
 # ——————————————————————————————————— CLI ———————————————————————————————————— #
 
@@ -73,74 +86,35 @@ parser.add_argument(
 parser.add_argument(
     "--average-on",
     metavar="N",
-    help="average the results on N runs (default to 1)",
+    help="collect N runs per point and keep their median (default to 1)",
     type=int,
     default=1,
     dest="average_on",
 )
+parser.add_argument(
+    "--warmup",
+    metavar="K",
+    help="number of untimed warm-up runs before a measured point (default to 1)",
+    type=int,
+    default=1,
+    dest="warmup",
+)
 parser.add_argument(
     "-e",
     "--experiment",
     help="name of the experiment, (default to 'default')",
     default="default",
 )
+parser.add_argument(
+    "--driver-core",
+    metavar="C",
+    help="core on which the driver is pinned (default to the last core)",
+    type=int,
+    dest="driver_core",
+)
 
 args = parser.parse_args()
-
-
-# —————————————————————————————————— Utils ——————————————————————————————————— #
-
-
-def log(text: str):
-    """Print a message, if verbose mode is activated"""
-    if args.verbose:
-        print(text)
-
-
-def run(cmd_args: List[str], with_timeout: bool = True):
-    """A small wrapper around subprocess.run, will check for errors & timeout"""
-    timeout = args.timeout if with_timeout else None
-    result = subprocess.run(cmd_args, timeout=timeout, stdout=subprocess.DEVNULL)
-    result.check_returncode()
-
-
-def run_benchmark(cmd_args: List[str], env: Dict[str, str]) -> Optional[Dict[str, int]]:
-    """A wrapper around subprocess.run for benchmark use.
-    The output of the subprocess will be captured, parsed as json and returned.
-    In case of timeout, None is returned instead.
-    """
-    handle = subprocess.Popen(cmd_args, stdout=subprocess.PIPE, env=env)
-    t = time.time()
-    while True:
-        ret = handle.poll()
-        if ret is None:
-            if time.time() - t > args.timeout:
-                # kill the process
-                handle.terminate()
-                handle.wait()
-                return None
-            else:
-                # Wait some more time
-                time.sleep(1)
-        else:
-            if not ret == 0 or handle.stdout is None:
-                # Something bad happened
-                raise Exception(f"Process exited with non zero code: {cmd_args}")
-            else:
-                # Return the benchmark results
-                return json.loads(handle.stdout.read())
-
-
-def prepare_flags(
-    flags: List[str], nb_threads: int, problem_size: int, task_size: int
-) -> List[str]:
-    """Substiture all placeholders in the given flags."""
-    return [
-        flag.replace("%n", str(nb_threads))
-        .replace("%t", str(task_size))
-        .replace("%p", str(problem_size))
-        for flag in flags
-    ]
+common.init(args)
 
 
 # ——————————————————————————————— Build Utils ———————————————————————————————— #
@@ -148,14 +122,13 @@ def prepare_flags(
 
 def build_reactrt_target(target: str) -> str:
     """Build a ReactRT target and return the name the produced artefact"""
-    chdir(rio_path)
     run(
         ["cargo", "build", "--package", "experiments", "--release"],
-        with_timeout=False,
+        cwd=rio_path,
     )
     dlib = "reactrt_" + target
-    reacrt_target_path = path.join("target", "release")
-    run(["cp", path.join(reacrt_target_path, target), path.join(benchmark_path, dlib)])
+    reacrt_target_path = path.join(rio_path, "target", "release")
+    copy_artefact(path.join(reacrt_target_path, target), path.join(benchmark_path, dlib))
     return dlib
 
 
@@ -165,6 +138,10 @@ if not args.average_on >= 1:
     print(f"Invalid number of runs: got '{args.average_on}'")
     sys.exit(1)
 
+if not args.warmup >= 0:
+    print(f"Invalid number of warm-up runs: got '{args.warmup}'")
+    sys.exit(1)
+
 print("Experiment setting:\n")
 print(f"  - problem size:\t{2 ** args.problem_size}")
 print(f"  - maximum task size:\t{2 ** args.maximum_task_size}")
@@ -176,114 +153,125 @@ print()
 # ——————————————————————————————— Build Phase ———————————————————————————————— #
 
 log("Checking `hwloc-bind` availability...")
-run(["hwloc-bind", "--version"])
+check_hwloc_bind()
 
 log("Loading data file if it exists...")
 experiments = {}
 try:
     if args.file is not None:
-        with open(args.file, "r") as file:
-            experiments = json.load(file)
+        with open(args.file, "rb") as file:
+            experiments = loads(file.read())
 except OSError:
     # The file does not yet exists, this is fine
     pass
 
 log("Building bench...")
-chdir(bench_path)
-run(["cargo", "install", "--path", "."], with_timeout=False)
+run(["cargo", "install", "--path", "."], cwd=bench_path)
 
 log("\nBuilding targets...")
-chdir(rio_path)
-run(["cargo", "build", "--release", "--examples"], with_timeout=False)
-run(["cp", program_path, exec_path], with_timeout=False)
+run(["cargo", "build", "--release", "--examples"], cwd=rio_path)
+copy_artefact(program_path, exec_path)
 
 # ———————————————————————————————— Benchmark ————————————————————————————————— #
 
-chdir(benchmark_path)
+# Pin the driver only once the builds are done, so that cargo still gets the
+# whole machine
+isolate_driver()
+
 problem_size = 2 ** args.problem_size
 n_runs = args.average_on
-experiments[args.experiment] = []
+experiment_runs = experiments.setdefault(args.experiment, [])
 for k in range(args.nb_threads):
     nb_threads = 2 ** k
+    if any(previous["nb_threads"] == nb_threads for previous in experiment_runs):
+        # Already measured by a previous (interrupted) run
+        log(f"Found run with {nb_threads} threads in data file, skipping")
+        continue
     log(f"Running with {nb_threads} thread{'s' if nb_threads > 1 else ''}...")
 
-    # Stats to be collected
-    experiment = {}
-    cycles = []
-    cpu_usage = []
-    instr_per_cycle = []
-    execution_time = []
-    cache_miss_rate = []
+    # Stats to be collected, one averaged value per task size and per metric
+    fields = ("cycles", "cpu_usage", "instr_per_cycle", "execution_time", "cache_miss_rate")
+    stats: Dict[str, List[float]] = {field: [] for field in fields}
     task_size = []
 
-    is_first_loop = True
-    for t_size in range(2, args.maximum_task_size + 1):
+    # The pin set and problem size are constant over the task-size sweep
+    p_size = problem_size * nb_threads
+    cmd_prefix = (
+        ["hwloc-bind"]
+        + list(prepare_flags(hwloc_bind_flags, nb_threads, p_size, 0))
+        + ["bench", f"{exec_path}"]
+    )
+
+    def completes(exponent: int) -> bool:
+        """Check whether a single run at the given task-size exponent finishes
+        within the timeout, discarding the measurement."""
+        probe_args = cmd_prefix + list(
+            prepare_flags(bench_flags, nb_threads, p_size, 2 ** exponent)
+        )
+        return run_benchmark(probe_args, environ, parse=False) is not None
+
+    # Execution time decreases monotonically with the task size, so the
+    # timeouts form a prefix of the sweep: binary-search the smallest
+    # exponent that completes instead of sitting through each leading
+    # timeout in turn
+    lo, hi = 2, args.maximum_task_size
+    if not completes(hi):
+        # Even the largest task size times out, nothing to measure
+        first_exponent = hi + 1
+    elif completes(lo):
+        first_exponent = lo
+    else:
+        # Invariant: lo times out, hi completes
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if completes(mid):
+                hi = mid
+            else:
+                lo = mid
+        first_exponent = hi
+
+    for t_size in range(first_exponent, args.maximum_task_size + 1):
         t_size = 2 ** t_size
-        p_size = problem_size * nb_threads
-        experiment_args = (
-            ["hwloc-bind"]
-            + prepare_flags(hwloc_bind_flags, nb_threads, p_size, t_size)
-            + ["bench", f"{exec_path}"]
-            + prepare_flags(bench_flags, nb_threads, p_size, t_size)
+        experiment_args = cmd_prefix + list(
+            prepare_flags(bench_flags, nb_threads, p_size, t_size)
         )
 
-        # Initialize averages
-        cycles.append(0)
-        cpu_usage.append(0)
-        instr_per_cycle.append(0)
-        execution_time.append(0)
-        cache_miss_rate.append(0)
+        # Warm up the caches before measuring, the discarded runs keep the
+        # median stable at small --average-on values
+        for _ in range(args.warmup):
+            run_benchmark(experiment_args, environ, parse=False)
 
-        # Run benchmark
+        # Run benchmark, collecting one sample per metric per run
         timeout = False
+        samples: Dict[str, List[float]] = {field: [] for field in fields}
         for _ in range(n_runs):
-            results = run_benchmark(experiment_args, dict(**environ))
+            results = run_benchmark(experiment_args, environ)
             if results is None:
                 log("Timeout")
                 timeout = True
                 break
             # Collect results
-            cycles[-1] += results["cycles"]
-            cpu_usage[-1] += results["cpu_usage"]
-            instr_per_cycle[-1] += results["instr_per_cycle"]
-            execution_time[-1] += results["execution_time"]
-            cache_miss_rate[-1] += results["cache_miss_rate"]
+            for field in fields:
+                samples[field].append(results[field])
 
         if timeout:
-            # Remove last data point
-            cycles.pop()
-            cpu_usage.pop()
-            instr_per_cycle.pop()
-            execution_time.pop()
-            cache_miss_rate.pop()
-            if is_first_loop:
-                continue
-            else:
-                break
-        else:
-            # Compute average
-            cycles[-1] /= n_runs
-            cpu_usage[-1] /= n_runs
-            instr_per_cycle[-1] /= n_runs
-            execution_time[-1] /= n_runs
-            cache_miss_rate[-1] /= n_runs
-            task_size.append(t_size)
-        is_first_loop = False
-
-    experiment["cycles"] = cycles
-    experiment["cpu_usage"] = cpu_usage
-    experiment["instr_per_cycle"] = instr_per_cycle
-    experiment["execution_time"] = execution_time
-    experiment["cache_miss_rate"] = cache_miss_rate
+            break
+        # Reduce the samples to their median, one pass per metric (the median
+        # is robust against scheduling outliers that would skew a mean)
+        for field in fields:
+            stats[field].append(statistics.median(samples[field]))
+        task_size.append(t_size)
+
+    experiment: Dict = dict(stats)
     experiment["task_size"] = task_size
     experiment["nb_threads"] = nb_threads
-    experiments[args.experiment].append(experiment)
+    experiment_runs.append(experiment)
+    # Persist partial results so an aborted run does not lose them
+    save_checkpoint(experiments)
 
 log(f"Done in {time.time() - t:.2f}s")
 
 if args.file is not None:
-    chdir(root)
-    with open(args.file, "w") as file:
-        json.dump(experiments, file, indent=2)
+    save_checkpoint(experiments)
 else:
-    print(json.dumps(experiments, indent=2))
+    print(dump_results(experiments))
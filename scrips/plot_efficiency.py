@@ -1,8 +1,31 @@
 import argparse
 import json
-import matplotlib.pyplot as plt
+import multiprocessing
+import pickle
+from os import path, replace
+import matplotlib
+
+# The script is headless (it only saves files): the object-oriented Figure
+# API skips pyplot's global figure registry and GUI backend selection
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# Maximum stream compression: the rasterized lines (see set_rasterized
+# below) compress well, shrinking the PDFs noticeably
+matplotlib.rcParams["pdf.compression"] = 9
+import numpy as np
 from typing import Dict, Any, List, Tuple
 
+# orjson is much faster than the standard json module on the number-heavy
+# data we plot, use it when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Both parsers accept bytes directly, so the data file can be read as-is
+loads = orjson.loads if orjson is not None else json.loads
+
 BARE_METAL = "bare_metal"
 RIO = "Rio"
 STARPU = "StarPU"
@@ -17,6 +40,10 @@ MM_INITIALIZATION = 0.86
 # Miriel node (in seconds)
 SEQUENTIAL_MKL_MM_EXEC_TIME = 4.79 - MM_INITIALIZATION
 
+# The four report rows, in grid order (counter_deps reuses the sequential
+# reference of counter)
+report_rows = ("counter", "counter_deps", "mm_counter", "lu_counter")
+
 # ——————————————————————————————————— CLI ———————————————————————————————————— #
 
 parser = argparse.ArgumentParser(description="Plot the graphs for the worker benchmark")
@@ -45,42 +72,93 @@ if not args.cpu:
 else:
     P = args.cpu
 
-benchmarks: Dict[str, Dict[str, Dict[str, Any]]] = {}
-with open(args.file, "r") as file:
-    benchmarks = json.load(file)
+def load_benchmarks(data_file: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Load the benchmark data, going through a pickle cache when possible.
+
+    Parsing the JSON dominates start-up time when iterating on plots, so the
+    parsed dict is cached next to the data file and reused as long as the
+    data file is not newer than the cache."""
+    cache_file = data_file + ".pkl"
+    try:
+        if path.getmtime(cache_file) >= path.getmtime(data_file):
+            with open(cache_file, "rb") as cache:
+                return pickle.load(cache)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        # No usable cache, fall back to parsing the JSON
+        pass
+    with open(data_file, "rb") as file:
+        benchmarks = loads(file.read())
+    try:
+        # Write through a tmp file so an interrupted run never leaves a
+        # truncated cache shadowing the data file
+        tmp_file = cache_file + ".tmp"
+        with open(tmp_file, "wb") as cache:
+            pickle.dump(benchmarks, cache, protocol=pickle.HIGHEST_PROTOCOL)
+        replace(tmp_file, cache_file)
+    except OSError:
+        # A read-only data directory is fine, the cache is best-effort
+        pass
+    return benchmarks
+
+
+def to_arrays(
+    benchmarks: Dict[str, Dict[str, Dict[str, Any]]]
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Convert every numeric leaf of the benchmark data to a float64 array
+    once, so that the helpers below run as vectorized array expressions
+    instead of per-element list comprehensions."""
+    for data in benchmarks.values():
+        for rt_data in data.values():
+            for (field, values) in rt_data.items():
+                if isinstance(values, list):
+                    rt_data[field] = np.asarray(values, dtype=np.float64)
+    return benchmarks
+
+
+benchmarks: Dict[str, Dict[str, Dict[str, Any]]] = load_benchmarks(args.file)
+if args.report:
+    # The report grid only reads four experiments, drop the rest before the
+    # array conversion pass
+    benchmarks = {name: benchmarks[name] for name in report_rows}
+benchmarks = to_arrays(benchmarks)
 
 # —————————————————————————————————— Utils ——————————————————————————————————— #
 
 
-def normalize(t_total, t):
-    return [t / t_tot for (t, t_tot) in zip(t, t_total)]
+def align_series(t_seq: np.ndarray, task_size: List[int]):
+    """Restrict the sequential reference times to the points the runtime
+    actually measured (it may have timed out at the end of the sweep).
 
+    Both series follow the same granularity sweep from its first point, so
+    the alignment is positional. The recorded task sizes cannot be joined on
+    directly: at the same granularity the bare-metal reference may use
+    rescaled task sizes (see matrixCounterParameters in the driver)."""
+    return np.asarray(t_seq, dtype=np.float64)[: len(task_size)]
 
-def scale_up(t: List[float], rt_data: Dict[str, Any]) -> List[float]:
-    scaled_t = t
+
+def scale_up(t: np.ndarray, rt_data: Dict[str, Any]) -> np.ndarray:
+    scaled_t = np.asarray(t, dtype=np.float64)
     if "scaling_factor" in rt_data:
-        scaled_t = [t * s for (t, s) in zip(scaled_t, rt_data["scaling_factor"])]
+        scaled_t = scaled_t * rt_data["scaling_factor"]
     if "frequency_scaling" in rt_data:
-        scaled_t = [t * s for (t, s) in zip(scaled_t, rt_data["frequency_scaling"])]
+        scaled_t = scaled_t * rt_data["frequency_scaling"]
     return scaled_t
 
 
-def compute_times(t_seq: List[float], rt_data: Dict[str, Any], runtime: str):
+def compute_times(t_seq: np.ndarray, rt_data: Dict[str, Any], runtime: str):
     # Runtime-independent
     t_total = rt_data["execution_time"]
-    t_task = t_seq  # By hypothesis, t_task = t_seq as there is no locality effect here
+    # By hypothesis, t_task = t_seq as there is no locality effect here
+    t_task = np.asarray(t_seq, dtype=np.float64)
 
     # Runtime-dependent
-    t_idle = None
-
     if runtime == RIO:
         # In Rio the time spent idle vs working is derived from the CPU usage.
-        cpu_usage = rt_data["cpu_usage"]
-        t_idle = [(1 - usage / P) * t_tot for (usage, t_tot) in zip(cpu_usage, t_total)]
+        t_idle = (1 - rt_data["cpu_usage"] / P) * t_total
     elif runtime == STARPU:
         # StarPU explicitely tell us how many time it spent sleeping, but that
         # must be scaled by the number of CPU.
-        t_idle = [x / P for x in rt_data["sleeping"]]
+        t_idle = rt_data["sleeping"] / P
     else:
         raise Exception(f"Unexpected runtime: {runtime}")
 
@@ -89,9 +167,7 @@ def compute_times(t_seq: List[float], rt_data: Dict[str, Any], runtime: str):
     t_idle = scale_up(t_idle, rt_data)
 
     # Finaly, the time spent not working or sleeping is counted as management.
-    t_management = [
-        t_tot - t_t - t_i for (t_tot, t_t, t_i) in zip(t_total, t_task, t_idle)
-    ]
+    t_management = t_total - t_task - t_idle
 
     return (t_total, t_task, t_idle, t_management)
 
@@ -101,50 +177,95 @@ def compute_efficiencies(
     t_total: List[float],
     t_task: List[float],
     t_idle: List[float],
-) -> Tuple[List[float], List[float], List[float]]:
-    e = [t_seq / t_tot for (t_seq, t_tot) in zip(t_seq, t_total)]
-    e_p = [t_t / (t_t + t_i) for (t_t, t_i) in zip(t_task, t_idle)]
-    e_m = [(t_t + t_i) / t_tot for (t_tot, t_t, t_i) in zip(t_total, t_task, t_idle)]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Vectorized instead of per-element comprehensions, the arrays are passed
+    # to ax.plot as-is
+    t_seq = np.asarray(t_seq, dtype=np.float64)
+    t_total = np.asarray(t_total, dtype=np.float64)
+    t_task = np.asarray(t_task, dtype=np.float64)
+    t_idle = np.asarray(t_idle, dtype=np.float64)
+    busy = t_task + t_idle
+    e = t_seq / t_total
+    e_p = t_task / busy
+    e_m = busy / t_total
     return (e, e_p, e_m)
 
 
 # —————————————————————————————————— Plots ——————————————————————————————————— #
 
+# The individual plots all share the same figure: creating and tearing down a
+# figure per plot is the dominant cost for these small graphs, so a single
+# canvas is reused and cleared between plots instead
+fig = Figure(figsize=(8, 4.5))
+FigureCanvasAgg(fig)
+ax = fig.subplots()
+
+
+def precompute_report(
+    benchmarks: Dict[str, Dict[str, Dict[str, Any]]]
+) -> Dict[Tuple[int, int], Tuple[Any, np.ndarray, np.ndarray, np.ndarray]]:
+    """Compute the efficiency decomposition of every report cell up front,
+    keyed by (row, column), so the plotting pass only draws."""
+    cells = {}
+    t_seq = None
+    for (x, experiment_name) in enumerate(report_rows):
+        experiment = benchmarks[experiment_name]
+        if experiment_name != "counter_deps":  # we keep the same t_seq
+            seq_data = experiment[BARE_METAL]
+            t_seq = scale_up(seq_data["execution_time"], seq_data)
+        for (y, runtime) in enumerate((RIO, STARPU)):
+            rt_data = experiment[runtime]
+            # Each runtime may have timed out at a different point of the sweep
+            cell_t_seq = align_series(t_seq, rt_data["task_size"])
+            (t_total, t_task, t_idle, _) = compute_times(cell_t_seq, rt_data, runtime)
+            (e, e_p, e_m) = compute_efficiencies(cell_t_seq, t_total, t_task, t_idle)
+            cells[(x, y)] = (rt_data["task_size"], e, e_p, e_m)
+    return cells
+
 
 def subplot_report_grid(
     x: int,
     y: int,
     axs,
-    experiment,
-    runtime: str,
-    t_seq: List[float],
+    cell: Tuple[Any, np.ndarray, np.ndarray, np.ndarray],
 ):
-    rt_data = experiment[runtime]
-    (t_total, t_task, t_idle, _) = compute_times(
-        t_seq,
-        rt_data,
-        runtime,
-    )
-    (e, e_p, e_m) = compute_efficiencies(t_seq, t_total, t_task, t_idle)
-    task_size = rt_data["task_size"]
-    axs[x, y].plot(task_size, e, label="$e$", marker="|", markersize=11)
-    axs[x, y].plot(task_size, e_p, label="$e_p$", marker="2", markersize=11, color="#d62728")
-    axs[x, y].plot(task_size, e_m, label="$e_r$", marker="1", markersize=11, color="#9467bd")
+    (task_size, e, e_p, e_m) = cell
+    # Resolve the subplot once rather than on every call
+    ax = axs[x, y]
+    # A single plot call creates the three lines at once, per-line styles are
+    # applied in one pass over the returned artists
+    lines = ax.plot(task_size, np.column_stack((e, e_p, e_m)), markersize=11)
+    for (line, label, marker, color) in zip(
+        lines,
+        ("$e$", "$e_p$", "$e_r$"),
+        ("|", "2", "1"),
+        (None, "#d62728", "#9467bd"),
+    ):
+        line.set_label(label)
+        line.set_marker(marker)
+        if color is not None:
+            line.set_color(color)
 
-    axs[x, y].set_xscale("log", base=10)
-    axs[x, y].set_ybound(-0.05, 1.05)
-    axs[x, y].grid(which="major")
+    ax.set_xscale("log", base=10)
+    ax.set_ybound(-0.05, 1.05)
+    ax.grid(which="major")
+
+    # Rasterize the lines so the PDF backend composites them as an image
+    # instead of one vector op per marker (text and axes stay vectorized)
+    for line in ax.get_lines():
+        line.set_rasterized(True)
 
 
 def plot_report_grid(benchmarks: Dict[str, Dict[str, Dict[str, Any]]]):
-    fig, axs = plt.subplots(
+    fig = Figure(figsize=(10, 12))
+    FigureCanvasAgg(fig)
+    axs = fig.subplots(
         4,
         2,
         sharex=True,
         sharey=True,
-        figsize=(10, 12),
     )
-    plt.subplots_adjust(
+    fig.subplots_adjust(
         hspace=0.05,
         wspace=0.05,
         left=0.08,
@@ -153,31 +274,10 @@ def plot_report_grid(benchmarks: Dict[str, Dict[str, Dict[str, Any]]]):
         bottom=0.06,
     )
 
-    # Counter
-    experiment = benchmarks["counter"]
-    t_seq = experiment[BARE_METAL]["execution_time"]
-    t_seq = scale_up(t_seq, experiment[BARE_METAL])
-    subplot_report_grid(0, 0, axs, experiment, RIO, t_seq)
-    subplot_report_grid(0, 1, axs, experiment, STARPU, t_seq)
-
-    # Counter with dependencies
-    experiment = benchmarks["counter_deps"]  # we keep the same t_seq
-    subplot_report_grid(1, 0, axs, experiment, RIO, t_seq)
-    subplot_report_grid(1, 1, axs, experiment, STARPU, t_seq)
-
-    # Matrix multiplication
-    experiment = benchmarks["mm_counter"]
-    t_seq = experiment[BARE_METAL]["execution_time"]
-    t_seq = scale_up(t_seq, experiment[BARE_METAL])
-    subplot_report_grid(2, 0, axs, experiment, RIO, t_seq)
-    subplot_report_grid(2, 1, axs, experiment, STARPU, t_seq)
-
-    # LU factorization
-    experiment = benchmarks["lu_counter"]
-    t_seq = experiment[BARE_METAL]["execution_time"]
-    t_seq = scale_up(t_seq, experiment[BARE_METAL])
-    subplot_report_grid(3, 0, axs, experiment, RIO, t_seq)
-    subplot_report_grid(3, 1, axs, experiment, STARPU, t_seq)
+    # All the cell data is computed in a single pre-pass, the loop below only
+    # plots
+    for ((x, y), cell) in precompute_report(benchmarks).items():
+        subplot_report_grid(x, y, axs, cell)
 
     # Titles, units and labels
     axs[0, 0].set_title("Decentralized In-Order (Rio)")
@@ -202,13 +302,12 @@ def plot_report_grid(benchmarks: Dict[str, Dict[str, Dict[str, Any]]]):
 
     axs[0, 0].legend()
 
-    # Done :)
-    fig.savefig(f"efficiency_report_24_cores.pdf")
-    plt.close(fig)
+    # Done :) (bbox_inches=None skips the automatic tight-bbox pass)
+    fig.savefig(f"efficiency_report_24_cores.pdf", dpi=150, bbox_inches=None)
 
 
 def plot_efficiency(
-    t_seq: List[float],
+    t_seq: np.ndarray,
     rt_data: Dict[str, Any],
     runtime: str,
     experiment: str,
@@ -217,7 +316,7 @@ def plot_efficiency(
 
     # Discard sequential execution time at a granularity for which the runtime
     # got a timeout
-    t_seq = t_seq[len(t_seq) - len(task_size) : len(t_seq)]
+    t_seq = align_series(t_seq, task_size)
 
     # Times
     (t_total, t_task, t_idle, t_management) = compute_times(
@@ -229,10 +328,9 @@ def plot_efficiency(
     # Efficiencies
     (e, e_p, e_m) = compute_efficiencies(t_seq, t_total, t_task, t_idle)
 
-    # Plot efficiencies
-    fig = plt.figure(figsize=(8, 4.5))
+    # Plot efficiencies, on the shared figure
+    ax.cla()
     fig.suptitle(f"Efficiency decomposition")
-    ax = plt.subplot()
     ax.set(
         ylabel="efficiency",
         xlabel="number of counter increments per task",
@@ -240,19 +338,17 @@ def plot_efficiency(
     ax.grid(which="major")
     ax.set_xscale("log", base=10)
 
-    ax.plot(task_size, e, label="$e$", marker="x")
-    ax.plot(task_size, e_p, label="$e_p$", marker="x")
-    ax.plot(task_size, e_m, label="$e_r$", marker="x")
+    lines = ax.plot(task_size, np.column_stack((e, e_p, e_m)), marker="x")
+    for (line, label) in zip(lines, ("$e$", "$e_p$", "$e_r$")):
+        line.set_label(label)
 
     ax.legend()
     ax.set_ybound(-0.05, 1.05)
     fig.savefig(f"efficiency_{experiment}_{runtime}")
-    plt.close(fig)
 
     # Plot times
-    fig = plt.figure(figsize=(8, 4.5))
+    ax.cla()
     fig.suptitle(f"Time repartition")
-    ax = plt.subplot()
     ax.set(
         ylabel="relative execution time",
         xlabel="number of counter increments per task",
@@ -260,20 +356,30 @@ def plot_efficiency(
     ax.grid(which="major")
     ax.set_xscale("log", base=10)
 
-    ax.plot(task_size, normalize(t_total, t_task), label="$\\tau_{p,t}$", marker="x")
-    ax.plot(task_size, normalize(t_total, t_idle), label="$\\tau_{p,i}$", marker="x")
-    ax.plot(
-        task_size, normalize(t_total, t_management), label="$\\tau_{p,m}$", marker="x"
+    # t_total is the common denominator of the three series: one reciprocal,
+    # then three multiplies
+    inv_t_total = np.reciprocal(t_total)
+    lines = ax.plot(
+        task_size,
+        np.column_stack(
+            (
+                t_task * inv_t_total,
+                t_idle * inv_t_total,
+                t_management * inv_t_total,
+            )
+        ),
+        marker="x",
     )
+    for (line, label) in zip(lines, ("$\\tau_{p,t}$", "$\\tau_{p,i}$", "$\\tau_{p,m}$")):
+        line.set_label(label)
 
     ax.legend()
     ax.set_ybound(-0.05, 1.05)
     fig.savefig(f"time_repartition_{experiment}_{runtime}")
-    plt.close(fig)
 
 
 def plot_full_efficiency(
-    t_seq: List[float],
+    t_seq: np.ndarray,
     rt_data: Dict[str, Any],
     runtime: str,
     experiment: str,
@@ -285,34 +391,32 @@ def plot_full_efficiency(
 
     # Discard sequential execution time at a granularity for which the runtime
     # got a timeout
-    t_seq = t_seq[len(t_seq) - len(task_size) : len(t_seq)]
+    t_seq = align_series(t_seq, task_size)
 
     # Times
     # Only works for StarPU!
-    t_total = rt_data["execution_time"]
-    t_task = rt_data["working"]
-    t_idle = rt_data["sleeping"]
+    t_total = np.asarray(rt_data["execution_time"], dtype=np.float64)
+    t_task = np.asarray(rt_data["working"], dtype=np.float64)
+    t_idle = np.asarray(rt_data["sleeping"], dtype=np.float64)
 
     # Remove time needed for matrix initialization
-    t_seq = [x - MM_INITIALIZATION for x in t_seq]
-    t_total = [x - MM_INITIALIZATION for x in t_total]
+    t_seq = np.asarray(t_seq, dtype=np.float64) - MM_INITIALIZATION
+    t_total = t_total - MM_INITIALIZATION
 
-    # Efficiencies
-    e = [SEQUENTIAL_MKL_MM_EXEC_TIME / (P * t_tot) for t_tot in t_total]
-    e_g = [SEQUENTIAL_MKL_MM_EXEC_TIME / t_seq for t_seq in t_seq]
+    # Efficiencies (vectorized, the arrays are passed to ax.plot as-is)
+    e = SEQUENTIAL_MKL_MM_EXEC_TIME / (P * t_total)
+    e_g = SEQUENTIAL_MKL_MM_EXEC_TIME / t_seq
     # There is already a hidden factor P in t_tasks (it's the sum of
     # t_task for all threads)
-    e_l = [t_seq / t_t for (t_seq, t_t) in zip(t_seq, t_task)]
-    e_p = [t_t / (t_t + t_i) for (t_t, t_i) in zip(t_task, t_idle)]
+    e_l = t_seq / t_task
+    e_p = t_task / (t_task + t_idle)
     # We need to scale t_tot here because it is the absolute elasped times
     # whereas t_t and t_i are cumulated times for all threads
-    e_m = [
-        (t_t + t_i) / (P * t_tot) for (t_tot, t_t, t_i) in zip(t_total, t_task, t_idle)
-    ]
+    e_m = (t_task + t_idle) / (P * t_total)
 
-    # Plot efficiencies
-    fig = plt.figure(figsize=(8, 4.5))
-    ax = plt.subplot()
+    # Plot efficiencies, on the shared figure (clearing any leftover suptitle)
+    ax.cla()
+    fig.suptitle("")
     ax.set(
         ylabel="efficiency",
         xlabel="sub-matrices' sizes",
@@ -320,16 +424,32 @@ def plot_full_efficiency(
     ax.grid(which="major")
     ax.set_xscale("log", base=2)
 
-    ax.plot(task_size, e, label="$e$", marker="x")
-    ax.plot(task_size, e_g, label="$e_g$", marker="x")
-    ax.plot(task_size, e_l, label="$e_l$", marker="x")
-    ax.plot(task_size, e_p, label="$e_p$", marker="x")
-    ax.plot(task_size, e_m, label="$e_r$", marker="x")
+    lines = ax.plot(task_size, np.column_stack((e, e_g, e_l, e_p, e_m)), marker="x")
+    for (line, label) in zip(lines, ("$e$", "$e_g$", "$e_l$", "$e_p$", "$e_r$")):
+        line.set_label(label)
+
+    # Rasterize the lines so the PDF backend composites them as an image
+    # instead of one vector op per marker (text and axes stay vectorized)
+    for line in ax.get_lines():
+        line.set_rasterized(True)
 
     ax.legend()
     # ax.set_ybound(-0.05, 1.05)
-    fig.savefig(f"efficiency_{experiment}_{runtime}.pdf")
-    plt.close(fig)
+    fig.savefig(f"efficiency_{experiment}_{runtime}.pdf", dpi=150, bbox_inches=None)
+
+
+def dispatch_plot(
+    t_seq: np.ndarray,
+    rt_data: Dict[str, Any],
+    runtime: str,
+    experiment: str,
+):
+    """Render the plots of a single (experiment, runtime) pair, used as entry
+    point by the rendering pool workers."""
+    if experiment == "mm_mkl":
+        plot_full_efficiency(t_seq, rt_data, runtime, experiment)
+    else:
+        plot_efficiency(t_seq, rt_data, runtime, experiment)
 
 
 # ———————————————————————————————— Main loop ————————————————————————————————— #
@@ -340,26 +460,35 @@ if args.report:
     # Plot the figure for the report, expects some experiments to be present
     plot_report_grid(benchmarks)
 else:
-    # Plot experiments present in the data file as individual plots
+    # Plot experiments present in the data file as individual plots. Each
+    # (experiment, runtime) pair writes to its own files, so the rendering —
+    # CPU-bound in matplotlib's backends — is dispatched to a pool of workers
+    # Experiments that reuse another experiment's sequential reference
+    seq_reference = {
+        "counter_deps": "counter",
+        "lu_counter_1d": "lu_counter",
+        "lu_counter_2d": "lu_counter",
+    }
+
+    plot_jobs = []
+    # The scaled reference series is cached per source experiment, so aliased
+    # experiments share it instead of recomputing it
+    t_seq_cache: Dict[str, Any] = {}
     for (experiment, data) in benchmarks.items():
+        seq_experiment = seq_reference.get(experiment, experiment)
+        seq_data = benchmarks[seq_experiment][BARE_METAL]
+        if seq_experiment not in t_seq_cache:
+            t_seq_cache[seq_experiment] = scale_up(seq_data["execution_time"], seq_data)
+        t_seq = t_seq_cache[seq_experiment]
         for (runtime, rt_data) in data.items():
             if runtime == BARE_METAL:
                 continue
-            elif experiment == "counter_deps":
-                seq_data = benchmarks["counter"][BARE_METAL]
-                t_seq = seq_data["execution_time"]
-                t_seq = scale_up(t_seq, seq_data)
-                plot_efficiency(t_seq, rt_data, runtime, experiment)
-            elif experiment == "lu_counter_1d" or experiment == "lu_counter_2d":
-                seq_data = benchmarks["lu_counter"][BARE_METAL]
-                t_seq = seq_data["execution_time"]
-                t_seq = scale_up(t_seq, seq_data)
-                plot_efficiency(t_seq, rt_data, runtime, experiment)
-            else:
-                seq_data = data[BARE_METAL]
-                t_seq = data[BARE_METAL]["execution_time"]
-                t_seq = scale_up(t_seq, seq_data)
-                if experiment == "mm_mkl":
-                    plot_full_efficiency(t_seq, rt_data, runtime, experiment)
-                else:
-                    plot_efficiency(t_seq, rt_data, runtime, experiment)
+            plot_jobs.append((t_seq, rt_data, runtime, experiment))
+
+    if plot_jobs:
+        # The workers rely on inheriting the module state (parsed data, shared
+        # figure) from this process, which only forking provides: spawn and
+        # forkserver would re-execute this whole script in every worker
+        ctx = multiprocessing.get_context("fork")
+        with ctx.Pool(min(len(plot_jobs), ctx.cpu_count())) as pool:
+            pool.starmap(dispatch_plot, plot_jobs)